@@ -1,241 +1,598 @@
+from gevent import monkey
+monkey.patch_all()
+
 from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 import threading
 import time
-import random
-from collections import defaultdict
-import uuid
+import numpy as np
+import orjson
+import msgpack
+from array import array
+from collections import deque, namedtuple
+from dataclasses import dataclass
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'koo-toueg-secret'
-socketio = SocketIO(app, cors_allowed_origins="*")
+
+class _OrJSON:
+    # json module replacement for Socket.IO packet encoding
+    @staticmethod
+    def dumps(obj, **_):
+        return orjson.dumps(obj).decode()
+    
+    loads = staticmethod(orjson.loads)
+
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='gevent', compression_threshold=512, json=_OrJSON)
+
+StateSnapshot = namedtuple('StateSnapshot', 'temperature pressure wind_speed humidity computation_step')
+
+@dataclass(slots=True)
+class Checkpoint:
+    pid: int
+    timestamp: float
+    state: StateSnapshot
+    sent_counter: bytes
+    rcvd_counter: bytes
+    type: str
+    checkpoint_id: str
+
+class Telemetry:
+    # Numeric state of every process, one array per field, indexed by slot
+    FIELDS = ("temperature", "pressure", "wind_speed", "humidity")
+    BASE = (20.0, 1013.0, 10.0, 60.0)
+    SPREAD = (5.0, 10.0, 3.0, 10.0)
+    DRIFT = (0.5, 2.0, 0.3, 0.5)
+    COUNTERS = ("computation_step", "messages_sent", "messages_received", "failed")
+        
+    def __init__(self):
+        self.rng = np.random.default_rng()
+        self.temperature = np.empty(0)
+        self.pressure = np.empty(0)
+        self.wind_speed = np.empty(0)
+        self.humidity = np.empty(0)
+        self.computation_step = np.empty(0, dtype=np.int64)
+        self.messages_sent = np.empty(0, dtype=np.int64)
+        self.messages_received = np.empty(0, dtype=np.int64)
+        self.failed = np.empty(0, dtype=bool)
+        # Uniform draws for one step: four field drifts and two message rolls per slot
+        self._rand_buf = np.empty((6, 0))
+        
+    def __len__(self):
+        return len(self.failed)
+        
+    def allocate(self):
+        for name, base, spread in zip(self.FIELDS, self.BASE, self.SPREAD):
+            value = base + self.rng.uniform(-spread, spread)
+            setattr(self, name, np.append(getattr(self, name), value))
+        for name in self.COUNTERS:
+            column = getattr(self, name)
+            setattr(self, name, np.append(column, np.zeros(1, column.dtype)))
+        return len(self) - 1
+        
+    def release(self, slot):
+        for name in self.FIELDS + self.COUNTERS:
+            setattr(self, name, np.delete(getattr(self, name), slot))
+        
+    def read(self, slot):
+        return {
+            "temperature": self.temperature[slot].item(),
+            "pressure": self.pressure[slot].item(),
+            "wind_speed": self.wind_speed[slot].item(),
+            "humidity": self.humidity[slot].item(),
+            "computation_step": self.computation_step[slot].item()
+        }
+        
+    def snapshot(self, slot):
+        return StateSnapshot(
+            self.temperature[slot].item(),
+            self.pressure[slot].item(),
+            self.wind_speed[slot].item(),
+            self.humidity[slot].item(),
+            self.computation_step[slot].item()
+        )
+        
+    def restore(self, slot, snapshot):
+        self.temperature[slot] = snapshot.temperature
+        self.pressure[slot] = snapshot.pressure
+        self.wind_speed[slot] = snapshot.wind_speed
+        self.humidity[slot] = snapshot.humidity
+        self.computation_step[slot] = snapshot.computation_step
+        
+    def step(self, intensity=1.0):
+        n = len(self)
+        if not n:
+            return
+        if self._rand_buf.shape[1] != n:
+            self._rand_buf = np.empty((6, n))
+        draws = self.rng.random(out=self._rand_buf)
+        live = ~self.failed
+        scale = live * intensity
+        for name, drift, row in zip(self.FIELDS, self.DRIFT, draws):
+            getattr(self, name)[:] += (row * (2 * drift) - drift) * scale
+        self.computation_step += live
+        
+        # Simulate message passing
+        self.messages_sent += (draws[4] > 0.7) & live
+        self.messages_received += (draws[5] > 0.7) & live
 
 class Process:
-    def __init__(self, pid, num_processes, custom_name=None):
+    __slots__ = (
+        'pid', 'custom_name', 'num_processes', 'telemetry', 'slot', 'checkpoints',
+        'num_checkpoints', 'last_checkpoint_id', 'sent_counter', 'rcvd_counter',
+        'status', 'checkpoint_type',
+        '_dirty', '_state_dict'
+    )
+    
+    def __init__(self, pid, num_processes, telemetry, custom_name=None, max_checkpoints=8):
         self.pid = pid
         self.custom_name = custom_name or f"Node-{pid}"
         self.num_processes = num_processes
-        self.state = {
-            "temperature": 20.0 + random.uniform(-5, 5),
-            "pressure": 1013.0 + random.uniform(-10, 10),
-            "wind_speed": 10.0 + random.uniform(-3, 3),
-            "humidity": 60.0 + random.uniform(-10, 10),
-            "computation_step": 0
-        }
-        self.checkpoints = []
-        self.sent_counter = defaultdict(int)
-        self.rcvd_counter = defaultdict(int)
-        self.is_failed = False
+        self.telemetry = telemetry
+        self.slot = telemetry.allocate()
+        # Recovery only ever rolls back to the newest checkpoint
+        self.checkpoints = deque(maxlen=max_checkpoints)
+        self.num_checkpoints = 0
+        self.last_checkpoint_id = None
+        # Per-peer message counters, indexed by peer pid
+        self.sent_counter = array('I', [0]) * (pid + 1)
+        self.rcvd_counter = array('I', [0]) * (pid + 1)
         self.status = "running"
         self.checkpoint_type = None
-        self.messages_sent = 0
-        self.messages_received = 0
+        self._dirty = True
+        # pid and name never change; dynamic keys are overwritten in place
+        self._state_dict = {"pid": self.pid, "custom_name": self.custom_name}
+        
+    @property
+    def state(self):
+        return self.telemetry.read(self.slot)
         
-    def take_tentative_checkpoint(self):
+    @property
+    def is_failed(self):
+        return bool(self.telemetry.failed[self.slot])
+        
+    @is_failed.setter
+    def is_failed(self, failed):
+        self.telemetry.failed[self.slot] = failed
+        
+    @property
+    def messages_sent(self):
+        return self.telemetry.messages_sent[self.slot].item()
+        
+    @property
+    def messages_received(self):
+        return self.telemetry.messages_received[self.slot].item()
+        
+    def mark_dirty(self):
+        self._dirty = True
+        
+    def grow_counters(self, num_peers):
+        missing = num_peers - len(self.sent_counter)
+        if missing > 0:
+            self.sent_counter.extend(array('I', [0]) * missing)
+            self.rcvd_counter.extend(array('I', [0]) * missing)
+        
+    def take_tentative_checkpoint(self, checkpoint_id):
+        self._dirty = True
         self.status = "checkpointing"
         self.checkpoint_type = "tentative"
-        checkpoint = {
-            "pid": self.pid,
-            "timestamp": time.time(),
-            "state": self.state.copy(),
-            "sent_counter": dict(self.sent_counter),
-            "rcvd_counter": dict(self.rcvd_counter),
-            "type": "tentative",
-            "checkpoint_id": str(uuid.uuid4())[:8]
-        }
-        return checkpoint
+        return Checkpoint(
+            pid=self.pid,
+            timestamp=time.time(),
+            state=self.telemetry.snapshot(self.slot),
+            sent_counter=self.sent_counter.tobytes(),
+            rcvd_counter=self.rcvd_counter.tobytes(),
+            type="tentative",
+            checkpoint_id=checkpoint_id
+        )
     
     def commit_checkpoint(self, checkpoint):
-        checkpoint["type"] = "permanent"
+        checkpoint.type = "permanent"
+        self._dirty = True
         self.checkpoints.append(checkpoint)
+        self.num_checkpoints += 1
+        self.last_checkpoint_id = checkpoint.checkpoint_id
         self.checkpoint_type = "permanent"
         
     def abort_checkpoint(self):
+        self._dirty = True
         self.status = "running"
         self.checkpoint_type = None
         
-    def simulate_computation(self, intensity=1.0):
-        if not self.is_failed:
-            self.state["temperature"] += random.uniform(-0.5, 0.5) * intensity
-            self.state["pressure"] += random.uniform(-2, 2) * intensity
-            self.state["wind_speed"] += random.uniform(-0.3, 0.3) * intensity
-            self.state["humidity"] += random.uniform(-0.5, 0.5) * intensity
-            self.state["computation_step"] += 1
-            
-            # Simulate message passing
-            if random.random() > 0.7:
-                self.messages_sent += 1
-            if random.random() > 0.7:
-                self.messages_received += 1
-            
     def restore_from_checkpoint(self):
         if self.checkpoints:
             last_checkpoint = self.checkpoints[-1]
-            self.state = last_checkpoint["state"].copy()
-            self.sent_counter = defaultdict(int, last_checkpoint["sent_counter"])
-            self.rcvd_counter = defaultdict(int, last_checkpoint["rcvd_counter"])
+            self._dirty = True
+            self.telemetry.restore(self.slot, last_checkpoint.state)
+            num_peers = len(self.sent_counter)
+            self.sent_counter = array('I', last_checkpoint.sent_counter)
+            self.rcvd_counter = array('I', last_checkpoint.rcvd_counter)
+            self.grow_counters(num_peers)
             self.is_failed = False
             self.status = "recovering"
-            return last_checkpoint["checkpoint_id"]
+            return last_checkpoint.checkpoint_id
         return None
         
     def simulate_failure(self):
+        self._dirty = True
         self.is_failed = True
         self.status = "failed"
         
     def get_state_dict(self):
-        return {
-            "pid": self.pid,
-            "custom_name": self.custom_name,
-            "state": self.state,
-            "status": self.status,
-            "checkpoint_type": self.checkpoint_type,
-            "num_checkpoints": len(self.checkpoints),
-            "is_failed": self.is_failed,
-            "messages_sent": self.messages_sent,
-            "messages_received": self.messages_received,
-            "last_checkpoint_id": self.checkpoints[-1]["checkpoint_id"] if self.checkpoints else None
-        }
+        out = self._state_dict
+        if self._dirty:
+            self._dirty = False
+            out["state"] = self.state
+            out["status"] = self.status
+            out["checkpoint_type"] = self.checkpoint_type
+            out["num_checkpoints"] = self.num_checkpoints
+            out["is_failed"] = self.is_failed
+            out["messages_sent"] = self.messages_sent
+            out["messages_received"] = self.messages_received
+            out["last_checkpoint_id"] = self.last_checkpoint_id
+        return out
 
 class SimulationController:
     def __init__(self):
         self.processes = []
+        self._by_pid = {}
+        self.telemetry = Telemetry()
         self.next_pid = 0
         self.is_running = False
         self.is_paused = False
         self.auto_mode = False
         self.computation_speed = 1.0
         self.checkpoint_frequency = 5
+        self.max_checkpoints = 8
         self.step_count = 0
+        self._states_cache = None
+        self._states_packed = None
+        self._states_dirty = True
+        self._ckpt_seq = 0
+        # Broadcasts raised within write_delay seconds go out as one frame
+        self.write_delay = 0.03
+        self._pending_update = False
+        self._pending_delta = False
+        self._pending_logs = []
+        self._started = False
+        # Every mutation runs on the command runner, in submission order
+        self._commands = socketio.server.eio.create_queue()
+        self._step_queued = False
+        self._flush_queued = False
+        # Multi-phase protocol in flight ('checkpoint' / 'recovery'), if any
+        self._protocol = None
+        self._tentative = []
+        self._pending_recoveries = deque()
+        self._epoch = 0
+        # Computation step of every slot as of the last broadcast
+        self._delta_base = np.empty(0, dtype=np.int64)
+        
+    def mark_dirty(self):
+        self._states_dirty = True
         
     def add_process(self, custom_name=None):
-        process = Process(self.next_pid, len(self.processes) + 1, custom_name)
+        process = Process(self.next_pid, len(self.processes) + 1, self.telemetry, custom_name, self.max_checkpoints)
+        for p in self.processes:
+            p.grow_counters(self.next_pid + 1)
         self.processes.append(process)
+        self._by_pid[process.pid] = process
         self.next_pid += 1
+        self.request_update()
+        self.log(f'✓ Added new process: {process.custom_name}')
         return process.pid
         
     def remove_process(self, pid):
-        self.processes = [p for p in self.processes if p.pid != pid]
+        process = self._by_pid.pop(pid, None)
+        if process:
+            del self.processes[process.slot]
+            self.telemetry.release(process.slot)
+            for p in self.processes[process.slot:]:
+                p.slot -= 1
+            # A node that leaves mid-round takes its tentative checkpoint with it
+            self._tentative = [(p, ckpt) for p, ckpt in self._tentative if p is not process]
+            self.request_update()
+            self.log(f'✗ Removed process: {process.custom_name}', 'error')
         
     def get_process(self, pid):
-        for p in self.processes:
-            if p.pid == pid:
-                return p
-        return None
+        return self._by_pid.get(pid)
         
-    def initiate_checkpoint(self):
-        socketio.emit('log', {
-            'message': '=== CHECKPOINT PHASE 1: Requesting Tentative Checkpoints ===',
-            'type': 'checkpoint'
-        })
-        socketio.sleep(0.3)
+    def next_ckpt_id(self):
+        # Checkpoint ids are display labels, a counter is enough
+        self._ckpt_seq += 1
+        return f"{self._ckpt_seq:08x}"
+        
+    def reset(self):
+        self.processes = []
+        self._by_pid = {}
+        self.telemetry = Telemetry()
+        self.next_pid = 0
+        self.is_running = False
+        self.is_paused = False
+        self.auto_mode = False
+        self.step_count = 0
+        # Drop any protocol phases still scheduled against the old processes
+        self._epoch += 1
+        self._protocol = None
+        self._tentative = []
+        self._pending_recoveries.clear()
+        self.request_update()
+        self.log('🔄 Simulation Reset')
         
-        tentative_checkpoints = []
+    def fail_process(self, pid):
+        process = self.get_process(pid)
+        if process and not process.is_failed:
+            process.simulate_failure()
+            self.request_update()
+            self.log(f'⚠️  FAILURE: {process.custom_name} has crashed!', 'error')
+            
+    def step_forward(self):
+        if not self.is_running or self.is_paused:
+            self.step_computation()
+            
+    def auto_step(self):
+        self._step_queued = False
+        # Computation holds still while a checkpoint or recovery is in flight
+        if self.is_running and self.auto_mode and not self.is_paused and not self._protocol:
+            self.step_computation()
+            
+    def queue_auto_step(self):
+        # Steps that pile up behind a slow command collapse into one
+        if not self._step_queued:
+            self._step_queued = True
+            self.submit(self.auto_step)
+            
+    def start_auto(self, speed, frequency):
+        self.auto_mode = True
+        self.is_running = True
+        self.is_paused = False
+        self.computation_speed = speed
+        self.checkpoint_frequency = frequency
+        self.mark_dirty()
+        self.log(f'▶️  AUTO MODE: Starting (Speed: {speed}x, Checkpoint every {frequency} steps)')
+        socketio.start_background_task(auto_simulation_loop)
+        
+    def pause(self):
+        self.is_paused = True
+        self.mark_dirty()
+        self.log('⏸️  Simulation Paused')
+        
+    def resume(self):
+        self.is_paused = False
+        self.mark_dirty()
+        self.log('▶️  Simulation Resumed')
+        
+    def stop(self):
+        self.is_running = False
+        self.is_paused = False
+        self.auto_mode = False
+        self.mark_dirty()
+        self.log('⏹️  Simulation Stopped', 'error')
+        
+    def submit(self, command, *args):
+        self._commands.put((command, args))
+        
+    def submit_later(self, delay, command, *args):
+        socketio.start_background_task(self._submit_after, delay, self._epoch, command, args)
+        
+    def _submit_after(self, delay, epoch, command, args):
+        socketio.sleep(delay)
+        self.submit(self._run_phase, epoch, command, args)
+        
+    def _run_phase(self, epoch, command, args):
+        if epoch != self._epoch:
+            return
+        try:
+            command(*args)
+        except Exception:
+            # A phase that raises must not leave the protocol holding the guard
+            self._end_protocol()
+            self._start_pending_recovery()
+            raise
+            
+    def _end_protocol(self):
         for process in self.processes:
             if not process.is_failed:
-                ckpt = process.take_tentative_checkpoint()
-                tentative_checkpoints.append((process, ckpt))
-                socketio.emit('update', self.get_all_states())
-                socketio.emit('log', {
-                    'message': f'{process.custom_name}: Tentative checkpoint [{ckpt["checkpoint_id"]}] at step {process.state["computation_step"]}',
-                    'type': 'info'
-                })
-                socketio.sleep(0.2)
+                process.abort_checkpoint()
+        self._tentative = []
+        self._protocol = None
+        self.request_update()
+        
+    def _run_commands(self):
+        while True:
+            command, args = self._commands.get()
+            try:
+                command(*args)
+            except Exception:
+                app.logger.exception('Simulation command %s failed', command.__name__)
+        
+    def log(self, message, type='info'):
+        self._pending_logs.append({'message': message, 'type': type})
+        
+    def request_update(self):
+        self._states_dirty = True
+        self._pending_update = True
+        
+    def request_delta(self):
+        self._states_dirty = True
+        self._pending_delta = True
         
-        socketio.sleep(0.3)
+    def emit_step_delta(self):
+        telemetry = self.telemetry
+        changed = np.flatnonzero(telemetry.computation_step != self._delta_base)
+        self._delta_base = telemetry.computation_step.copy()
+        processes = {}
+        for slot in changed.tolist():
+            processes[self.processes[slot].pid] = {
+                'state': telemetry.read(slot),
+                'messages_sent': telemetry.messages_sent[slot].item(),
+                'messages_received': telemetry.messages_received[slot].item()
+            }
+        return {'step_count': self.step_count, 'processes': processes}
         
-        # Phase 2: Commit decision
-        all_success = len(tentative_checkpoints) == len([p for p in self.processes if not p.is_failed])
+    def flush(self):
+        self._flush_queued = False
+        if self._pending_delta and len(self._delta_base) != len(self.telemetry):
+            self._pending_update = True
+        if self._pending_update:
+            self._pending_update = False
+            self._pending_delta = False
+            self._delta_base = self.telemetry.computation_step.copy()
+            socketio.emit('update', self.get_all_states_bytes())
+        elif self._pending_delta:
+            self._pending_delta = False
+            delta = msgpack.packb(self.emit_step_delta(), use_bin_type=True)
+            socketio.emit('delta', delta)
+        if self._pending_logs:
+            logs, self._pending_logs = self._pending_logs, []
+            socketio.emit('log_batch', logs)
+            
+    def send_state(self, sid):
+        # Like flush, this refreshes the state caches, so it runs on the runner too
+        socketio.emit('update', self.get_all_states_bytes(), to=sid)
+        
+    def start(self):
+        if not self._started:
+            self._started = True
+            socketio.start_background_task(self._run_commands)
+            socketio.start_background_task(self._broadcast_loop)
+            
+    def _broadcast_loop(self):
+        while True:
+            socketio.sleep(self.write_delay)
+            self.queue_flush()
+            
+    def queue_flush(self):
+        # flush rebuilds the state caches and the delta base, so it runs on the runner
+        if not self._flush_queued:
+            self._flush_queued = True
+            self.submit(self.flush)
+        
+    def initiate_checkpoint(self):
+        if self._protocol:
+            self.log(f'Checkpoint skipped: {self._protocol} already in progress', 'error')
+            return
+        self._protocol = 'checkpoint'
+        self._checkpoint_request()
+        
+    # Each protocol phase is its own command; pacing delays are timers between
+    # them so failures, pauses and stops submitted meanwhile still get a turn
+    def _checkpoint_request(self):
+        self.log('=== CHECKPOINT PHASE 1: Requesting Tentative Checkpoints ===', 'checkpoint')
+        self.submit_later(0.3, self._checkpoint_tentative)
+        
+    def _checkpoint_tentative(self):
+        # Every live process takes its tentative checkpoint in the same phase
+        self._tentative = [
+            (p, p.take_tentative_checkpoint(self.next_ckpt_id()))
+            for p in self.processes if not p.is_failed
+        ]
+        for process, ckpt in self._tentative:
+            self.log(f'{process.custom_name}: Tentative checkpoint [{ckpt.checkpoint_id}] at step {ckpt.state.computation_step}')
+        self.request_update()
+        self.submit_later(0.3, self._checkpoint_decide)
+        
+    def _checkpoint_decide(self):
+        # Phase 2: Commit decision; nodes added after phase 1 are not part of this round
+        all_success = not any(p.is_failed for p, _ in self._tentative)
         
         if all_success:
-            socketio.emit('log', {
-                'message': '=== CHECKPOINT PHASE 2: All ACKs Received - COMMITTING ===',
-                'type': 'success'
-            })
-            socketio.sleep(0.3)
-            for process, ckpt in tentative_checkpoints:
-                process.commit_checkpoint(ckpt)
-                socketio.emit('update', self.get_all_states())
-                socketio.emit('log', {
-                    'message': f'{process.custom_name}: Checkpoint [{ckpt["checkpoint_id"]}] COMMITTED ✓',
-                    'type': 'success'
-                })
-                socketio.sleep(0.2)
+            self.log('=== CHECKPOINT PHASE 2: All ACKs Received - COMMITTING ===', 'success')
+            self.submit_later(0.3, self._checkpoint_commit)
         else:
-            socketio.emit('log', {
-                'message': '=== CHECKPOINT ABORTED - Some processes failed ===',
-                'type': 'error'
-            })
-            for process, _ in tentative_checkpoints:
-                process.abort_checkpoint()
-                
-        socketio.sleep(0.3)
-        for process in self.processes:
-            if not process.is_failed:
-                process.status = "running"
-                process.checkpoint_type = None
-                
-        socketio.emit('update', self.get_all_states())
-        return all_success
+            self.log('=== CHECKPOINT ABORTED - Some processes failed ===', 'error')
+            for process, _ in self._tentative:
+                if not process.is_failed:
+                    process.abort_checkpoint()
+            self.request_update()
+            self.submit_later(0.3, self._checkpoint_finish)
+            
+    def _checkpoint_commit(self):
+        for process, ckpt in self._tentative:
+            process.commit_checkpoint(ckpt)
+            self.log(f'{process.custom_name}: Checkpoint [{ckpt.checkpoint_id}] COMMITTED ✓', 'success')
+        self.request_update()
+        self.submit_later(0.3, self._checkpoint_finish)
+        
+    def _checkpoint_finish(self):
+        self._end_protocol()
+        self._start_pending_recovery()
         
     def initiate_recovery(self, failed_pid):
         failed_process = self.get_process(failed_pid)
         if not failed_process:
             return
+        if self._protocol:
+            # Recovery waits for the protocol in flight instead of being dropped
+            if failed_pid not in self._pending_recoveries:
+                self._pending_recoveries.append(failed_pid)
+                self.log(f'Recovery for {failed_process.custom_name} queued until the {self._protocol} completes', 'recovery')
+            return
+        self._protocol = 'recovery'
             
-        socketio.emit('log', {
-            'message': f'=== RECOVERY INITIATED for {failed_process.custom_name} ===',
-            'type': 'recovery'
-        })
-        socketio.sleep(0.5)
+        self.log(f'=== RECOVERY INITIATED for {failed_process.custom_name} ===', 'recovery')
+        self.submit_later(0.5, self._recovery_restore, failed_pid)
+        
+    def _start_pending_recovery(self):
+        while self._pending_recoveries and not self._protocol:
+            self.initiate_recovery(self._pending_recoveries.popleft())
         
-        failed_process.is_failed = False
+    def _recovery_restore(self, failed_pid):
+        failed_process = self.get_process(failed_pid)
+        if failed_process:
+            failed_process.is_failed = False
+            failed_process.mark_dirty()
         
         for process in self.processes:
             ckpt_id = process.restore_from_checkpoint()
             if ckpt_id:
-                socketio.emit('log', {
-                    'message': f'{process.custom_name}: Restored to checkpoint [{ckpt_id}] at step {process.state["computation_step"]}',
-                    'type': 'recovery'
-                })
-                socketio.sleep(0.2)
-                socketio.emit('update', self.get_all_states())
-        
-        socketio.sleep(0.5)
+                self.log(f'{process.custom_name}: Restored to checkpoint [{ckpt_id}] at step {process.state["computation_step"]}', 'recovery')
+        self.request_update()
+        self.submit_later(0.5, self._recovery_finish)
         
+    def _recovery_finish(self):
         for process in self.processes:
             process.status = "running"
+            process.mark_dirty()
             
-        socketio.emit('update', self.get_all_states())
-        socketio.emit('log', {
-            'message': '=== RECOVERY COMPLETE - Resuming Computation ===',
-            'type': 'success'
-        })
+        self._protocol = None
+        self.request_update()
+        self.log('=== RECOVERY COMPLETE - Resuming Computation ===', 'success')
+        self._start_pending_recovery()
         
     def step_computation(self):
         self.step_count += 1
-        socketio.emit('log', {
-            'message': f'--- Computation Step {self.step_count} ---',
-            'type': 'step'
-        })
+        self.log(f'--- Computation Step {self.step_count} ---', 'step')
         
+        self.telemetry.step(self.computation_speed)
         for process in self.processes:
-            process.simulate_computation(self.computation_speed)
+            process.mark_dirty()
             
-        socketio.emit('update', self.get_all_states())
+        self.request_delta()
         
         # Auto checkpoint based on frequency
-        if self.auto_mode and self.step_count % self.checkpoint_frequency == 0:
-            socketio.sleep(0.5)
-            self.initiate_checkpoint()
+        if self.auto_mode and self.step_count % self.checkpoint_frequency == 0 and not self._protocol:
+            self._protocol = 'checkpoint'
+            self.submit_later(0.5, self._checkpoint_request)
         
     def get_all_states(self):
-        return {
+        if not self._states_dirty:
+            return self._states_cache
+        self._states_dirty = False
+        self._states_packed = None
+        self._states_cache = {
             'processes': [p.get_state_dict() for p in self.processes],
             'step_count': self.step_count,
             'is_running': self.is_running,
             'is_paused': self.is_paused
         }
+        return self._states_cache
+        
+    def get_all_states_bytes(self):
+        # Encoded once per mutation, then shared by broadcasts and every connecting client
+        states = self.get_all_states()
+        if self._states_packed is None:
+            self._states_packed = msgpack.packb(states, use_bin_type=True)
+        return self._states_packed
 
 # Global controller
 controller = SimulationController()
@@ -246,108 +603,67 @@ def index():
 
 @socketio.on('connect')
 def handle_connect():
-    emit('update', controller.get_all_states())
+    controller.start()
+    controller.submit(controller.send_state, request.sid)
     emit('log', {'message': '✓ Connected to Koo-Toueg Simulation Server', 'type': 'info'})
 
 @socketio.on('add_process')
 def handle_add_process(data):
-    custom_name = data.get('name', None)
-    pid = controller.add_process(custom_name)
-    emit('update', controller.get_all_states(), broadcast=True)
-    emit('log', {
-        'message': f'✓ Added new process: {controller.get_process(pid).custom_name}',
-        'type': 'info'
-    }, broadcast=True)
+    controller.submit(controller.add_process, data.get('name', None))
 
 @socketio.on('remove_process')
 def handle_remove_process(data):
-    pid = data.get('pid')
-    process = controller.get_process(pid)
-    if process:
-        name = process.custom_name
-        controller.remove_process(pid)
-        emit('update', controller.get_all_states(), broadcast=True)
-        emit('log', {
-            'message': f'✗ Removed process: {name}',
-            'type': 'error'
-        }, broadcast=True)
+    controller.submit(controller.remove_process, data.get('pid'))
 
 @socketio.on('trigger_failure')
 def handle_trigger_failure(data):
-    pid = data.get('pid')
-    process = controller.get_process(pid)
-    if process and not process.is_failed:
-        process.simulate_failure()
-        emit('update', controller.get_all_states(), broadcast=True)
-        emit('log', {
-            'message': f'⚠️  FAILURE: {process.custom_name} has crashed!',
-            'type': 'error'
-        }, broadcast=True)
+    controller.submit(controller.fail_process, data.get('pid'))
 
 @socketio.on('trigger_recovery')
 def handle_trigger_recovery(data):
-    pid = data.get('pid')
-    socketio.start_background_task(controller.initiate_recovery, pid)
+    controller.submit(controller.initiate_recovery, data.get('pid'))
 
 @socketio.on('trigger_checkpoint')
 def handle_trigger_checkpoint():
-    socketio.start_background_task(controller.initiate_checkpoint)
+    controller.submit(controller.initiate_checkpoint)
 
 @socketio.on('step_forward')
 def handle_step_forward():
-    if not controller.is_running or controller.is_paused:
-        controller.step_computation()
+    controller.submit(controller.step_forward)
 
 @socketio.on('start_auto')
 def handle_start_auto(data):
-    controller.auto_mode = True
-    controller.is_running = True
-    controller.is_paused = False
-    controller.computation_speed = data.get('speed', 1.0)
-    controller.checkpoint_frequency = data.get('frequency', 5)
-    
-    emit('log', {
-        'message': f'▶️  AUTO MODE: Starting (Speed: {controller.computation_speed}x, Checkpoint every {controller.checkpoint_frequency} steps)',
-        'type': 'info'
-    }, broadcast=True)
-    
-    socketio.start_background_task(auto_simulation_loop)
+    controller.submit(controller.start_auto, data.get('speed', 1.0), data.get('frequency', 5))
 
 @socketio.on('pause_simulation')
 def handle_pause():
-    controller.is_paused = True
-    emit('log', {'message': '⏸️  Simulation Paused', 'type': 'info'}, broadcast=True)
+    controller.submit(controller.pause)
 
 @socketio.on('resume_simulation')
 def handle_resume():
-    controller.is_paused = False
-    emit('log', {'message': '▶️  Simulation Resumed', 'type': 'info'}, broadcast=True)
+    controller.submit(controller.resume)
 
 @socketio.on('stop_simulation')
 def handle_stop():
-    controller.is_running = False
-    controller.is_paused = False
-    controller.auto_mode = False
-    emit('log', {'message': '⏹️  Simulation Stopped', 'type': 'error'}, broadcast=True)
+    controller.submit(controller.stop)
 
 @socketio.on('reset_simulation')
 def handle_reset():
-    controller.processes = []
-    controller.next_pid = 0
-    controller.is_running = False
-    controller.is_paused = False
-    controller.auto_mode = False
-    controller.step_count = 0
-    emit('update', controller.get_all_states(), broadcast=True)
-    emit('log', {'message': '🔄 Simulation Reset', 'type': 'info'}, broadcast=True)
+    controller.submit(controller.reset)
 
 def auto_simulation_loop():
+    deadline = time.monotonic()
     while controller.is_running and controller.auto_mode:
         if not controller.is_paused:
-            controller.step_computation()
-            socketio.sleep(1.0 / controller.computation_speed)
+            controller.queue_auto_step()
+            # Queueing never blocks, so this paces when steps are requested; the
+            # deadline only slips if the event loop wakes us late, and then we
+            # resync rather than fire catch-up ticks
+            deadline = max(deadline + 1.0 / controller.computation_speed, time.monotonic())
+            socketio.sleep(max(0.0, deadline - time.monotonic()))
         else:
             socketio.sleep(0.1)
+            deadline = time.monotonic()
 
 if __name__ == '__main__':
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
+    socketio.run(app, debug=False, host='0.0.0.0', port=5000)
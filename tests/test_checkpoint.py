@@ -0,0 +1,92 @@
+import unittest
+
+import app
+
+
+class CheckpointRoundTest(unittest.TestCase):
+    # Phases are run by hand instead of from the runner's timers
+    def setUp(self):
+        self.controller = app.SimulationController()
+        self.scheduled = []
+        self.controller.submit_later = lambda delay, command, *args: self.scheduled.append((command, args))
+        for _ in range(3):
+            self.controller.add_process()
+
+    def run_phases(self):
+        while self.scheduled:
+            command, args = self.scheduled.pop(0)
+            self.controller._run_phase(self.controller._epoch, command, args)
+
+    def start_round(self):
+        self.controller.initiate_checkpoint()
+        command, args = self.scheduled.pop(0)
+        self.assertEqual(command, self.controller._checkpoint_tentative)
+        self.controller._run_phase(self.controller._epoch, command, args)
+
+    def logs(self):
+        return [entry['message'] for entry in self.controller._pending_logs]
+
+    def test_remove_during_round_commits_remaining_nodes(self):
+        self.start_round()
+        self.controller.remove_process(2)
+        self.run_phases()
+        self.assertIsNone(self.controller._protocol)
+        for process in self.controller.processes:
+            self.assertEqual(process.num_checkpoints, 1)
+            self.assertEqual(process.status, "running")
+
+    def test_removing_failed_node_does_not_read_a_stale_slot(self):
+        self.start_round()
+        self.controller.fail_process(0)
+        self.controller.remove_process(0)
+        self.run_phases()
+        self.assertIsNone(self.controller._protocol)
+        self.assertEqual([p.num_checkpoints for p in self.controller.processes], [1, 1])
+
+    def test_failure_during_round_aborts(self):
+        self.start_round()
+        self.controller.fail_process(1)
+        self.run_phases()
+        self.assertIsNone(self.controller._protocol)
+        self.assertIn('=== CHECKPOINT ABORTED - Some processes failed ===', self.logs())
+        self.assertEqual([p.num_checkpoints for p in self.controller.processes], [0, 0, 0])
+
+    def test_add_during_round_commits_participants_only(self):
+        self.start_round()
+        pid = self.controller.add_process()
+        self.run_phases()
+        self.assertIsNone(self.controller._protocol)
+        self.assertNotIn('=== CHECKPOINT ABORTED - Some processes failed ===', self.logs())
+        self.assertEqual(self.controller.get_process(pid).num_checkpoints, 0)
+        self.assertEqual([p.num_checkpoints for p in self.controller.processes[:3]], [1, 1, 1])
+
+    def test_raising_phase_releases_protocol(self):
+        self.start_round()
+        self.controller._tentative[0] = (self.controller.processes[0], None)
+        command, args = self.scheduled.pop(0)
+        self.controller._run_phase(self.controller._epoch, command, args)
+        command, args = self.scheduled.pop(0)
+        self.assertEqual(command, self.controller._checkpoint_commit)
+        with self.assertRaises(AttributeError):
+            self.controller._run_phase(self.controller._epoch, command, args)
+        self.assertIsNone(self.controller._protocol)
+        self.assertEqual(self.controller._tentative, [])
+        for process in self.controller.processes:
+            self.assertEqual(process.status, "running")
+        self.controller.initiate_checkpoint()
+        self.assertEqual(self.controller._protocol, 'checkpoint')
+
+    def test_recovery_during_round_runs_after_it(self):
+        self.start_round()
+        self.controller.fail_process(1)
+        self.controller.initiate_recovery(1)
+        self.assertEqual(self.controller._protocol, 'checkpoint')
+        self.run_phases()
+        self.assertIsNone(self.controller._protocol)
+        self.assertIn('=== RECOVERY INITIATED for Node-1 ===', self.logs())
+        self.assertEqual(self.logs()[-1], '=== RECOVERY COMPLETE - Resuming Computation ===')
+        self.assertFalse(self.controller.get_process(1).is_failed)
+
+
+if __name__ == '__main__':
+    unittest.main()